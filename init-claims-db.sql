@@ -4,25 +4,26 @@ CREATE DATABASE claims;
 -- Connect to the claims database
 \c claims
 
--- Create the raw_inpatient_claims table (simplified schema for disk space efficiency)
-CREATE TABLE IF NOT EXISTS raw_inpatient_claims (
+-- Create the raw_inpatient_claims table (simplified schema for disk space efficiency;
+-- UNLOGGED because it is a staging table reloaded on every pipeline run)
+CREATE UNLOGGED TABLE IF NOT EXISTS raw_inpatient_claims (
     "DESYNPUF_ID" VARCHAR(255),
     "CLM_ID" VARCHAR(255),
     "SEGMENT" VARCHAR(255),
     "CLM_FROM_DT" DATE,
     "CLM_THRU_DT" DATE,
     "PRVDR_NUM" VARCHAR(255),
-    "CLM_PMT_AMT" NUMERIC,
-    "NCH_PRMRY_PYR_CLM_PD_AMT" NUMERIC,
+    "CLM_PMT_AMT" NUMERIC NOT NULL DEFAULT 0,
+    "NCH_PRMRY_PYR_CLM_PD_AMT" NUMERIC NOT NULL DEFAULT 0,
     "AT_PHYSN_NPI" VARCHAR(255),
     "OP_PHYSN_NPI" VARCHAR(255),
     "OT_PHYSN_NPI" VARCHAR(255),
     "CLM_ADMSN_DT" DATE,
     "ADMTNG_ICD9_DGNS_CD" VARCHAR(255),
-    "CLM_PASS_THRU_PER_DIEM_AMT" NUMERIC,
-    "NCH_BENE_IP_DDCTBL_AMT" NUMERIC,
-    "NCH_BENE_PTA_COINSRNC_LBLTY_AM" NUMERIC,
-    "NCH_BENE_BLOOD_DDCTBL_LBLTY_AM" NUMERIC,
+    "CLM_PASS_THRU_PER_DIEM_AMT" NUMERIC NOT NULL DEFAULT 0,
+    "NCH_BENE_IP_DDCTBL_AMT" NUMERIC NOT NULL DEFAULT 0,
+    "NCH_BENE_PTA_COINSRNC_LBLTY_AM" NUMERIC NOT NULL DEFAULT 0,
+    "NCH_BENE_BLOOD_DDCTBL_LBLTY_AM" NUMERIC NOT NULL DEFAULT 0,
     "CLM_UTLZTN_DAY_CNT" INTEGER,
     "NCH_BENE_DSCHRG_DT" DATE,
     "CLM_DRG_CD" VARCHAR(255),
@@ -32,25 +33,37 @@ CREATE TABLE IF NOT EXISTS raw_inpatient_claims (
     processed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Create the patient_claims_plus table (analytics view)
-CREATE TABLE IF NOT EXISTS patient_claims_plus (
-    claim_id VARCHAR(255),
-    patient_id VARCHAR(255),
-    claim_start_date DATE,
-    claim_end_date DATE,
-    provider_id VARCHAR(255),
-    payment_amount NUMERIC,
-    admission_date DATE,
-    length_of_stay INTEGER,
-    total_cost NUMERIC,
-    primary_diagnosis VARCHAR(255),
-    procedure_count INTEGER,
-    diagnosis_count INTEGER,
-    is_emergency BOOLEAN,
-    year INTEGER,
-    month INTEGER,
-    processed_date TIMESTAMP
-);
+-- Index the admitting diagnosis prefix used by the is_emergency flag
+CREATE INDEX IF NOT EXISTS idx_raw_admitting_dx_prefix
+    ON raw_inpatient_claims ((substr("ADMTNG_ICD9_DGNS_CD", 1, 1)));
+
+-- Create the patient_claims_plus materialized view (analytics view, refreshed by the pipeline)
+CREATE MATERIALIZED VIEW IF NOT EXISTS patient_claims_plus AS
+SELECT
+    "CLM_ID" as claim_id,
+    "DESYNPUF_ID" as patient_id,
+    "CLM_FROM_DT" as claim_start_date,
+    "CLM_THRU_DT" as claim_end_date,
+    "PRVDR_NUM" as provider_id,
+    "CLM_PMT_AMT" as payment_amount,
+    "CLM_ADMSN_DT" as admission_date,
+    "CLM_UTLZTN_DAY_CNT" as length_of_stay,
+    "CLM_PMT_AMT" + "NCH_PRMRY_PYR_CLM_PD_AMT" + 
+        "NCH_BENE_IP_DDCTBL_AMT" + "NCH_BENE_PTA_COINSRNC_LBLTY_AM" as total_cost,
+    "ICD9_DGNS_CD_1" as primary_diagnosis,
+    ("ICD9_DGNS_CD_2" IS NOT NULL OR "ICD9_DGNS_CD_3" IS NOT NULL)::INTEGER as procedure_count,
+    ("ICD9_DGNS_CD_1" IS NOT NULL)::INTEGER +
+    ("ICD9_DGNS_CD_2" IS NOT NULL)::INTEGER +
+    ("ICD9_DGNS_CD_3" IS NOT NULL)::INTEGER as diagnosis_count,
+    CASE 
+        WHEN substr("ADMTNG_ICD9_DGNS_CD", 1, 1) IN ('8', '9') THEN TRUE
+        ELSE FALSE 
+    END as is_emergency,
+    EXTRACT(YEAR FROM "CLM_FROM_DT")::INTEGER as year,
+    EXTRACT(MONTH FROM "CLM_FROM_DT")::INTEGER as month,
+    CURRENT_TIMESTAMP::TIMESTAMP as processed_date
+FROM 
+    raw_inpatient_claims;
 
 -- Create a user for the application to connect with
 CREATE USER claims_user WITH PASSWORD 'claims_password';